@@ -1,125 +1,143 @@
 """Compact Postgres adapter with demo-mode toggles.
 
 Features:
-- When DEMO_MODE=True uses an in-memory store (no psycopg2 import required).
-- When DEMO_MODE=False uses psycopg2.pool.SimpleConnectionPool.
-- Provides execute/fetchall/fetchone and explicit init/close of pool.
+- When DEMO_MODE=True uses an in-memory store (no driver import required).
+- When DEMO_MODE=False uses an asyncpg pool created lazily on first use, so
+  queries never block the event loop the way a sync driver would.
+- Provides async execute/fetchall/fetchone/fetchrow and explicit close.
 - Keeps implementation intentionally small and easy to extend.
 """
 
+import asyncio
+import functools
 import logging
 import re
-from contextlib import contextmanager
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 from app.config import config
 
+try:
+    import asyncpg
+except Exception:  # pragma: no cover - optional
+    asyncpg = None
+
 logger = logging.getLogger(__name__)
 
+# Very small SQL helpers for demo store (supports simple INSERT and SELECT *).
+# The regexes are only the slow path inside _parse_demo_query; callers hit the
+# lru_cache since demo queries are almost always constant strings.
+_insert_re = re.compile(r"INSERT\s+INTO\s+(?P<table>\w+)\s*\((?P<cols>[^)]+)\)\s*VALUES\s*\((?P<vals>[^)]+)\)", re.I)
+_select_re = re.compile(r"SELECT\s+\*\s+FROM\s+(?P<table>\w+)(?:\s+WHERE\s+(?P<where>.+))?", re.I)
+
+
+@functools.lru_cache(maxsize=256)
+def _parse_demo_query(query: str) -> Tuple[str, str, Optional[Any]]:
+    """Parse once, execute many: returns ("insert", table, cols) or
+    ("select", table, where); raises NotImplementedError for other shapes."""
+    q = query.lstrip()[:7].upper()
+    if q.startswith("INSERT"):
+        m = _insert_re.search(query)
+        if not m:
+            raise NotImplementedError("Demo adapter only supports simple INSERT statements for execute()")
+        cols = tuple(c.strip() for c in m.group("cols").split(","))
+        return ("insert", m.group("table"), cols)
+    if q.startswith("SELECT"):
+        m = _select_re.search(query)
+        if not m:
+            raise NotImplementedError("Demo adapter only supports simple SELECT * FROM <table> [WHERE col=%s]")
+        return ("select", m.group("table"), m.group("where"))
+    raise NotImplementedError("Demo adapter only supports simple INSERT and SELECT statements")
+
 
 class PostgresAdapter:
-    def __init__(self, cfg=config):
+    def __init__(self, cfg=config, dsn: Optional[str] = None,
+                 min_size: Optional[int] = None, max_size: Optional[int] = None):
         self.cfg = cfg
+        self.dsn = dsn or cfg.POSTGRES_DSN
+        self.min_size = min_size if min_size is not None else cfg.POOL_MIN
+        self.max_size = max_size if max_size is not None else cfg.POOL_MAX
         self._pool = None
+        self._pool_lock = asyncio.Lock()
         # demo in-memory store: table -> list of dict rows
         self._demo_store: Dict[str, List[Dict[str, Any]]] = {}
+        # specialize by config once: callers pay no DEMO_MODE branch per query
+        if cfg.DEMO_MODE:
+            self.execute = self._execute_demo
+            self.fetchall = self._fetchall_demo
+        else:
+            self.execute = self._execute_real
+            self.fetchall = self._fetchall_real
+
+    async def _ensure_pool(self):
+        if self._pool is None:
+            if asyncpg is None:
+                raise RuntimeError("asyncpg is required when DEMO_MODE is False")
+            async with self._pool_lock:
+                if self._pool is None:
+                    self._pool = await asyncpg.create_pool(self.dsn, min_size=self.min_size, max_size=self.max_size)
+                    logger.info("PostgresAdapter: connection pool initialized")
+        return self._pool
+
+    async def _execute_demo(self, query: str, params: Optional[List[Any]] = None) -> None:
+        """Execute a statement against the demo store (basic INSERT semantics)."""
+        kind, table, cols = _parse_demo_query(query)
+        if kind != "insert":
+            raise NotImplementedError("Demo adapter only supports simple INSERT statements for execute()")
+        # params expected as tuple/list aligning with cols
+        if params is None:
+            raise ValueError("params required for demo INSERT")
+        vals = list(params)
+        if len(cols) != len(vals):
+            raise ValueError("column/value length mismatch")
+        row = dict(zip(cols, vals))
+        self._demo_store.setdefault(table, []).append(row)
+        logger.debug("Demo INSERT into %s: %s", table, row)
+
+    async def _execute_real(self, query: str, params: Optional[List[Any]] = None) -> None:
+        pool = await self._ensure_pool()
+        async with pool.acquire() as conn:
+            await conn.execute(query, *(params or []))
+
+    async def _fetchall_demo(self, query: str, params: Optional[List[Any]] = None) -> List[Dict[str, Any]]:
+        """Return list of dict rows (SELECT * FROM <table> [WHERE col=%s])."""
+        kind, table, where = _parse_demo_query(query)
+        if kind != "select":
+            raise NotImplementedError("Demo adapter only supports simple SELECT * FROM <table> [WHERE col=%s]")
+        rows = list(self._demo_store.get(table, []))
+        if where and params:
+            # very small WHERE parser: expects single equality like "col = %s"
+            parts = where.split("=")
+            if len(parts) != 2:
+                raise NotImplementedError("Demo WHERE supports single equality only")
+            col = parts[0].strip()
+            val = params[0]
+            rows = [r for r in rows if r.get(col) == val]
+        logger.debug("Demo SELECT from %s returned %d rows", table, len(rows))
+        return rows
+
+    async def _fetchall_real(self, query: str, params: Optional[List[Any]] = None) -> List[Dict[str, Any]]:
+        pool = await self._ensure_pool()
+        async with pool.acquire() as conn:
+            rows = await conn.fetch(query, *(params or []))
+            return [dict(r) for r in rows]
+
+    async def fetchone(self, query: str, params: Optional[List[Any]] = None) -> Optional[Dict[str, Any]]:
+        rows = await self.fetchall(query, params)
+        return rows[0] if rows else None
 
-    def init_pool(self):
-        if self.cfg.DEMO_MODE:
-            logger.info("PostgresAdapter: DEMO_MODE enabled, skipping real pool initialization")
-            return
-        try:
-            import psycopg2.pool as _pool  # type: ignore
-        except Exception as e:
-            raise RuntimeError("psycopg2 is required when DEMO_MODE is False") from e
-        self._pool = _pool.SimpleConnectionPool(self.cfg.POOL_MIN, self.cfg.POOL_MAX, dsn=self.cfg.POSTGRES_DSN)
-        logger.info("PostgresAdapter: connection pool initialized")
-
-    @contextmanager
-    def _real_conn(self):
-        assert self._pool is not None, "Pool not initialized"
-        conn = self._pool.getconn()
-        try:
-            yield conn
-        finally:
-            try:
-                self._pool.putconn(conn)
-            except Exception:
-                # swallow - pool shutdown in progress maybe
-                pass
-
-    # Very small SQL helpers for demo store (supports simple INSERT and SELECT *)
-    _insert_re = re.compile(r"INSERT\s+INTO\s+(?P<table>\w+)\s*\((?P<cols>[^)]+)\)\s*VALUES\s*\((?P<vals>[^)]+)\)", re.I)
-    _select_re = re.compile(r"SELECT\s+\*\s+FROM\s+(?P<table>\w+)(?:\s+WHERE\s+(?P<where>.+))?", re.I)
-
-    def execute(self, query: str, params: Optional[List[Any]] = None) -> None:
-        """Execute a statement. In demo mode supports basic INSERT semantics."""
-        if self.cfg.DEMO_MODE:
-            m = self._insert_re.search(query)
-            if not m:
-                raise NotImplementedError("Demo adapter only supports simple INSERT statements for execute()")
-            table = m.group("table")
-            cols = [c.strip() for c in m.group("cols").split(",")]
-            # params expected as tuple/list aligning with cols
-            if params is None:
-                raise ValueError("params required for demo INSERT")
-            vals = list(params)
-            if len(cols) != len(vals):
-                raise ValueError("column/value length mismatch")
-            row = dict(zip(cols, vals))
-            self._demo_store.setdefault(table, []).append(row)
-            logger.debug("Demo INSERT into %s: %s", table, row)
-            return
-
-        with self._real_conn() as conn:
-            cur = conn.cursor()
-            try:
-                cur.execute(query, params)
-                conn.commit()
-            except Exception:
-                conn.rollback()
-                raise
-            finally:
-                cur.close()
-
-    def fetchall(self, query: str, params: Optional[List[Any]] = None) -> List[Dict[str, Any]]:
-        """Return list of dict rows. In demo mode supports SELECT * FROM <table> [WHERE col=%s]."""
+    async def fetchrow(self, query: str, *args):
+        """asyncpg-style positional-args fetch of a single row."""
         if self.cfg.DEMO_MODE:
-            m = self._select_re.search(query)
-            if not m:
-                raise NotImplementedError("Demo adapter only supports simple SELECT * FROM <table> [WHERE col=%s]")
-            table = m.group("table")
-            where = m.group("where")
-            rows = list(self._demo_store.get(table, []))
-            if where and params:
-                # very small WHERE parser: expects single equality like "col = %s"
-                parts = where.split("=")
-                if len(parts) != 2:
-                    raise NotImplementedError("Demo WHERE supports single equality only")
-                col = parts[0].strip()
-                val = params[0]
-                rows = [r for r in rows if r.get(col) == val]
-            logger.debug("Demo SELECT from %s returned %d rows", table, len(rows))
-            return rows
-
-        with self._real_conn() as conn:
-            cur = conn.cursor()
-            try:
-                cur.execute(query, params)
-                cols = [desc[0] for desc in cur.description] if cur.description else []
-                results = [dict(zip(cols, row)) for row in cur.fetchall()]
-                return results
-            finally:
-                cur.close()
-
-    def fetchone(self, query: str, params: Optional[List[Any]] = None) -> Optional[Dict[str, Any]]:
-        rows = self.fetchall(query, params)
-        return rows[0] if rows else None
+            return await self.fetchone(query, list(args) or None)
+        pool = await self._ensure_pool()
+        async with pool.acquire() as conn:
+            row = await conn.fetchrow(query, *args)
+            return dict(row) if row is not None else None
 
-    def close(self):
+    async def close(self):
         if self._pool:
             try:
-                self._pool.closeall()
+                await self._pool.close()
             finally:
                 self._pool = None
             logger.info("PostgresAdapter: pool closed")
@@ -133,10 +151,4 @@ def get_adapter() -> PostgresAdapter:
     global _adapter_singleton
     if _adapter_singleton is None:
         _adapter_singleton = PostgresAdapter()
-        try:
-            _adapter_singleton.init_pool()
-        except Exception:
-            # init_pool may raise if psycopg2 missing when DEMO_MODE False
-            logger.exception("Failed to init postgres pool")
-            raise
     return _adapter_singleton
@@ -1,49 +1,395 @@
-from fastapi import FastAPI, HTTPException
-from pydantic import BaseModel
 import asyncio
+import base64
+import collections
+import contextlib
+import itertools
+import time
+import random
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+from fastapi import FastAPI, HTTPException, Response, Request
+from starlette.responses import JSONResponse
 
-app = FastAPI()
+from . import clock, config, metrics
+from .cache import cache_get, cache_set, start_sweeper, stop_sweeper
+from .downstream import DownstreamClient, JitterBuffer
+from .schemas import ProcessRequest, ProcessResponse, Health, TaskPayload  # noqa: F401 - documented API shapes
+from .worker_pool import WorkerPool, QueueFullError
 
-class TaskPayload(BaseModel):
-    task: object | None = None
-    meta: dict | None = None
+# msgspec decodes JSON several times faster than the stdlib; fall back to
+# orjson/json so the dependency stays optional
+try:
+    import msgspec
 
+    _decode_task = msgspec.json.Decoder(dict).decode
+    _decode_batch = msgspec.json.Decoder(list).decode
+    _encode_json = msgspec.json.Encoder().encode
+except Exception:  # pragma: no cover - optional
+    try:
+        from orjson import loads as _decode_task, dumps as _encode_json
+    except Exception:
+        import json as _json
 
-def _queue():
-    q = getattr(app.state, "queue", None)
-    if q is None:
-        raise RuntimeError("Queue not initialized")
-    return q
+        _decode_task = _json.loads
 
+        def _encode_json(obj: Any) -> bytes:
+            return _json.dumps(obj, separators=(",", ":")).encode()
+    _decode_batch = _decode_task
 
-@app.post("/enqueue")
-async def enqueue(payload: TaskPayload):
-    q = _queue()
+logging.basicConfig(level=logging.INFO, format='%(message)s')
+log = logging.getLogger("backpressure")
+
+# install uvloop for entrypoints that don't pass a loop flag themselves
+# (plain `uvicorn app.api:app`, scripts); app/main.py also selects it
+try:
+    import uvloop
+
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+except ImportError:  # pragma: no cover - optional
+    pass
+
+
+@contextlib.asynccontextmanager
+async def lifespan(app: "FastAPI"):
+    # startup: background clock/metrics/sweeper plus both worker pools
+    global _ready
+    # size the default executor up front: /metrics rendering and any blocking
+    # work share it, and the stdlib default of min(32, cpus + 4) is too small
+    asyncio.get_running_loop().set_default_executor(
+        ThreadPoolExecutor(max_workers=config.THREAD_POOL_SIZE, thread_name_prefix="app-io"))
+    clock.start()
+    start_sweeper()
+    workers = [asyncio.create_task(worker_loop(i)) for i in range(WORKERS)]
+    await pool.start()
+    _ready = True
+    log.info({"event": "startup", "workers": WORKERS, "queue_maxsize": QUEUE_MAXSIZE})
+    yield
+    # shutdown: deterministic teardown instead of abandoned tasks
+    _ready = False
+    await pool.stop()
+    for t in workers:
+        t.cancel()
+    await asyncio.gather(*workers, return_exceptions=True)
+    stop_sweeper()
+    clock.stop()
+
+
+class MsgspecJSONResponse(Response):
+    """JSON response rendered by msgspec (orjson/json fallback); several
+    times faster than the default json.dumps path on dict payloads."""
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return _encode_json(content)
+
+
+app = FastAPI(title="backpressure-demo", lifespan=lifespan, default_response_class=MsgspecJSONResponse)
+
+# single pre-resolved gauge; labelled gauges would pay a lookup per request
+_inprogress = metrics.INPROGRESS
+# pre-resolved clock: skips the time-module attribute lookup per request
+_perf = time.perf_counter
+
+
+@app.middleware("http")
+async def prometheus_middleware(request: Request, call_next):
+    # raw scope reads skip the URL object request.url builds per access
+    scope = request.scope
+    method = scope["method"]
+    _inprogress.inc()
+    start = _perf()
+    status = "500"
     try:
-        q.put_nowait(payload.dict())
+        response = await call_next(request)
+        status = str(response.status_code)
+        return response
+    finally:
+        _inprogress.dec()
+        # label by the matched route template (set on the scope during
+        # routing), never the raw URL; unmatched paths collapse into one
+        # sentinel so a URL scanner can't mint a registry series per probe
+        route = scope.get("route")
+        path = route.path_format if route is not None else "unmatched"
+        # pre-bound children: dict get + inc/observe, no .labels() per request
+        metrics.count_child(method, path, status).inc()
+        metrics.latency_child(method, path).observe(_perf() - start)
+
+# Backpressure / queue / worker pool config
+QUEUE_MAXSIZE = config.QUEUE_MAXSIZE
+WORKERS = config.WORKER_COUNT
+TASK_TIMEOUT = config.TASK_TIMEOUT
+RETRY_AFTER_SEC = config.RETRY_AFTER_SEC
+# items a worker drains per wakeup; amortizes the event-loop round-trip
+WORKER_BATCH = config.WORKER_BATCH
+
+
+class DequeQueue:
+    """Bounded queue built from a plain deque (guarded only by the GIL) and a
+    single Event that idle workers wait on. Avoids asyncio.Queue's per-get
+    future allocation and one-waiter-per-put wakeup hop. Producers never
+    block: put_nowait raises QueueFull so callers can shed load with a 503.
+    """
+
+    def __init__(self, maxsize: int = 0):
+        self.maxsize = maxsize
+        self._dq: collections.deque = collections.deque()
+        self._not_empty = asyncio.Event()
+
+    def put_nowait(self, item: Any) -> None:
+        if self.maxsize and len(self._dq) >= self.maxsize:
+            raise asyncio.QueueFull
+        self._dq.append(item)
+        self._not_empty.set()
+
+    def get_nowait(self) -> Any:
+        try:
+            return self._dq.popleft()
+        except IndexError:
+            raise asyncio.QueueEmpty from None
+
+    async def get(self) -> Any:
+        while True:
+            try:
+                return self._dq.popleft()
+            except IndexError:
+                pass
+            # clear before re-checking so a put racing with us re-sets the event
+            self._not_empty.clear()
+            if self._dq:
+                continue
+            await self._not_empty.wait()
+
+    def qsize(self) -> int:
+        return len(self._dq)
+
+    def empty(self) -> bool:
+        return not self._dq
+
+    def task_done(self) -> None:
+        # kept for asyncio.Queue API compatibility; nothing to account
+        pass
+
+
+# runtime state: results live in a fixed ring of preallocated slots indexed by a
+# monotonically increasing job sequence, so memory stays bounded and lookups are O(1)
+SLOTS = QUEUE_MAXSIZE * 100
+queue: DequeQueue = DequeQueue(maxsize=QUEUE_MAXSIZE)
+results: list[dict[str, Any]] = [{"status": "empty"} for _ in range(SLOTS)]
+_seq = itertools.count()
+start_time = time.time()
+
+# worker pool backing /enqueue: bounded queue in front of the simulated
+# downstream client (retries + circuit breaker live in DownstreamClient)
+downstream = DownstreamClient()
+pool = WorkerPool(queue_size=QUEUE_MAXSIZE, workers=WORKERS, downstream=downstream)
+_ready = False
+
+
+def _encode_id(idx: int) -> str:
+    return base64.b32encode(idx.to_bytes(4, "big")).decode("ascii").rstrip("=").lower()
+
+
+def _decode_id(id: str) -> int | None:
+    try:
+        raw = base64.b32decode(id.upper() + "=" * (-len(id) % 8))
+        idx = int.from_bytes(raw, "big")
+    except Exception:
+        return None
+    return idx if 0 <= idx < SLOTS else None
+
+
+# simple circuit breaker state; plain module floats so the per-request check
+# is a single attribute load + compare, no dict hashing
+_cb_failures = 0
+_cb_open_until = 0.0
+CB_FAILURE_THRESHOLD = config.CB_FAILURE_THRESHOLD
+CB_OPEN_SECONDS = config.CB_RESET_SECONDS
+
+CACHE_TTL = config.CACHE_TTL
+
+# prefilled uniform samples; avoids two random.random() calls per task
+_jitter = JitterBuffer()
+
+# shared backoff table; defined once in config from BACKOFF_BASE/MAX_RETRIES
+_BACKOFF = config.BACKOFF_SCHEDULE
+
+
+async def simulated_downstream(payload: bytes) -> bytes:
+    """Simulated unreliable downstream: random failures and latency."""
+    if _cb_open_until > clock.NOW:
+        raise RuntimeError("circuit-open")
+
+    # simulate latency
+    await asyncio.sleep(0.2 + _jitter.next() * 0.4)
+
+    # random failure
+    if _jitter.next() < 0.2:
+        raise RuntimeError("downstream-failure")
+
+    # bytes slice is a single memcpy; str reverse walks code points
+    return payload[::-1]
+
+
+async def process_item(item: tuple[int, bytes]):
+    global _cb_failures, _cb_open_until
+    idx, payload = item
+    # mutate the slot in place to avoid rebinding a fresh dict per state change
+    r = results[idx]
+    r.clear()
+    r["status"] = "processing"
+    attempt = 0
+    while attempt < 3:
+        attempt += 1
+        try:
+            # asyncio.timeout is cheaper than wait_for: no wrapper Task per call
+            async with asyncio.timeout(TASK_TIMEOUT):
+                res = await simulated_downstream(payload)
+            r["status"] = "done"
+            r["result"] = res.decode("utf-8", "replace")
+            # success resets circuit breaker
+            _cb_failures = 0
+            return
+        except Exception as exc:
+            log.info({"event": "task-fail", "idx": idx, "err": str(exc), "attempt": attempt})
+            _cb_failures += 1
+            if _cb_failures >= CB_FAILURE_THRESHOLD:
+                _cb_open_until = clock.NOW + CB_OPEN_SECONDS
+                log.info({"event": "circuit-open", "open_until": _cb_open_until})
+            # simple backoff with jitter; clamped in case MAX_RETRIES is
+            # configured below this loop's attempt count
+            await asyncio.sleep(_BACKOFF[min(attempt, len(_BACKOFF) - 1)] + _jitter.next() * 0.1)
+    r["status"] = "failed"
+    r["error"] = "max-retries"
+
+
+async def worker_loop(idx: int):
+    log.info({"event": "worker-start", "idx": idx})
+    while True:
+        items = [await queue.get()]
+        # drain whatever else is already queued so fast tasks don't pay one
+        # scheduler round-trip each
+        for _ in range(WORKER_BATCH - 1):
+            try:
+                items.append(queue.get_nowait())
+            except asyncio.QueueEmpty:
+                break
+        try:
+            outcomes = await asyncio.gather(*(process_item(i) for i in items), return_exceptions=True)
+            for exc in outcomes:
+                if isinstance(exc, Exception):
+                    log.info({"event": "worker-except", "err": str(exc)})
+        finally:
+            for _ in items:
+                queue.task_done()
+
+
+# no response_model: the handlers return plain dicts that the msgspec
+# response class encodes directly, skipping a pydantic validate+dump pass
+# (ProcessResponse in app/schemas.py stays as the documented shape)
+@app.post("/process", status_code=202)
+async def submit(request: Request):
+    # quick fail if circuit is open
+    if _cb_open_until > clock.NOW:
+        return JSONResponse({"detail": "service temporarily unavailable"}, status_code=503, headers={"Retry-After": str(RETRY_AFTER_SEC)})
+
+    # read the raw body and pass bytes straight through; skipping the
+    # json + pydantic round-trip is a measured win on this hot path
+    payload = await request.body()
+    idx = next(_seq) % SLOTS
+    r = results[idx]
+    r.clear()
+    r["status"] = "queued"
+    try:
+        queue.put_nowait((idx, payload))
     except asyncio.QueueFull:
-        metrics = getattr(app.state, "metrics", None)
-        if metrics is not None:
-            metrics["rejected"] = metrics.get("rejected", 0) + 1
+        r["status"] = "empty"
+        return JSONResponse({"detail": "backlog full"}, status_code=503, headers={"Retry-After": str(RETRY_AFTER_SEC)})
+    return {"id": _encode_id(idx), "status": "accepted"}
+
+
+@app.post("/enqueue")
+async def enqueue(request: Request):
+    # decode the body directly; full pydantic validation of an arbitrary
+    # dict payload is pure overhead on this hot path (TaskPayload remains
+    # the documented shape in app/schemas.py)
+    body = await request.body()
+    try:
+        payload = _decode_task(body) if body else {}
+    except Exception:
+        raise HTTPException(status_code=422, detail="invalid JSON body")
+    if not isinstance(payload, dict):
+        raise HTTPException(status_code=422, detail="expected a JSON object")
+    try:
+        # nothing awaits the job result here, so skip the Future allocation
+        job_id = pool.submit_fire_and_forget(payload)
+    except QueueFullError:
+        metrics.inc_rejected()
+        raise HTTPException(status_code=429, detail="Queue full, backpressure applied")
+    return {"status": "accepted", "id": job_id, "queue_depth": pool.queue.qsize(), "queue_capacity": pool.capacity}
+
+
+@app.post("/enqueue_batch")
+async def enqueue_batch(request: Request):
+    # bursty producers should coalesce arrivals client-side and post one
+    # array here; the pool enqueues the burst as a handful of batch tuples
+    body = await request.body()
+    try:
+        payloads = _decode_batch(body) if body else []
+    except Exception:
+        raise HTTPException(status_code=422, detail="invalid JSON body")
+    if not isinstance(payloads, list) or not all(isinstance(p, dict) for p in payloads):
+        raise HTTPException(status_code=422, detail="expected a JSON array of objects")
+    try:
+        job_ids = await pool.submit_many(payloads)
+    except QueueFullError:
+        metrics.inc_rejected()
         raise HTTPException(status_code=429, detail="Queue full, backpressure applied")
-    metrics = getattr(app.state, "metrics", None)
-    if metrics is not None:
-        metrics["enqueued"] = metrics.get("enqueued", 0) + 1
-    return {"status": "accepted", "queue_depth": q.qsize(), "queue_capacity": q.maxsize}
+    return {"status": "accepted", "ids": job_ids, "queue_depth": pool.queue.qsize(), "queue_capacity": pool.capacity}
+
+
+@app.get("/result/{id}")
+async def get_result(id: str):
+    idx = _decode_id(id)
+    if idx is None:
+        raise HTTPException(status_code=404, detail="not found")
+    r = results[idx]
+    if r.get("status") == "empty":
+        raise HTTPException(status_code=404, detail="not found")
+    return r
+
+
+# invariant response bytes; probes hit these endpoints every few seconds and
+# most of their cost is response serialization, not logic
+_HEALTH_PREFIX = b'{"status":"ok","uptime":'
+_READY_TRUE = b'{"ready":true}'
+_READY_FALSE = b'{"ready":false}'
 
 
 @app.get("/health")
 async def health():
-    q = getattr(app.state, "queue", None)
-    metrics = getattr(app.state, "metrics", {})
-    return {
-        "status": "ok",
-        "queue_depth": q.qsize() if q is not None else None,
-        "queue_capacity": q.maxsize if q is not None else None,
-        "metrics": metrics,
-    }
+    uptime = f"{time.time() - start_time:.3f}".encode()
+    return Response(content=_HEALTH_PREFIX + uptime + b"}", media_type="application/json")
 
 
 @app.get("/ready")
 async def ready():
-    return {"ready": bool(getattr(app.state, "ready", False))}
+    return Response(content=_READY_TRUE if _ready else _READY_FALSE, media_type="application/json")
+
+
+@app.get("/metrics")
+async def export_metrics():
+    # rendered off-loop and cached for METRICS_CACHE_TTL across scrapers
+    return Response(content=await metrics.latest_snapshot(), media_type=metrics.CONTENT_TYPE_LATEST)
+
+
+@app.get("/cache")
+async def get_cached(key: str = "time"):
+    v = await cache_get(key)
+    if v is not None:
+        return {"key": key, "value": v, "cached": True}
+    # populate cache (cheap computation; wall clock only on the cold path)
+    val = {"ts": time.time(), "rand": random.random()}
+    await cache_set(key, val, ttl=CACHE_TTL)
+    return {"key": key, "value": val, "cached": False}
@@ -1,66 +1,93 @@
-import time
+"""Single process-wide TTL cache.
+
+CPython dict get/set on string keys are atomic under the GIL, so reads and
+single-key writes take no lock at all: a hit is one C-level dict probe plus
+a float compare against the cached clock tick. Locks exist only to dedupe
+concurrent loaders in cache_get_or_set (64 hash stripes, constant memory).
+Expired entries are dropped lazily on read and by a periodic sweep task.
+"""
 import asyncio
-from typing import Any, Callable, Dict, Optional, Awaitable
-
-class TTLCache:
-    def __init__(self):
-        self._data: Dict[str, tuple[float, Any]] = {}
-        self._locks: Dict[str, asyncio.Lock] = {}
-        self._global_lock = asyncio.Lock()
-
-    def _now(self) -> float:
-        return time.monotonic()
-
-    async def get(self, key: str) -> Optional[Any]:
-        entry = self._data.get(key)
-        if not entry:
-            return None
-        exp, val = entry
-        if exp < self._now():
-            # expired
-            async with self._global_lock:
-                # double-check inside lock
-                entry2 = self._data.get(key)
-                if entry2 and entry2[0] < self._now():
-                    self._data.pop(key, None)
-            return None
-        return val
+import heapq
+from typing import Any, Callable, Dict, List, Optional, Awaitable
+
+from . import clock
+
+# power of two so stripe selection is a mask, not a mod; 64 is plenty even
+# for 100k-key caches
+_NUM_STRIPES = 64
+SWEEP_INTERVAL = 30.0
+
+_cache: Dict[str, tuple[float, Any]] = {}
+# parallel min-heap of (expiry, key) so the sweep pops only what actually
+# expired instead of scanning every entry; stale heap entries from re-sets
+# are skipped lazily against the live expiry
+_exp_heap: List[tuple[float, str]] = []
+_stripes = [asyncio.Lock() for _ in range(_NUM_STRIPES)]
+_sweep_task: Optional[asyncio.Task] = None
+
+
+async def cache_get(key: str) -> Optional[Any]:
+    entry = _cache.get(key)
+    if not entry:
+        return None
+    if entry[0] > clock.NOW:
+        return entry[1]
+    # expired; pop without a lock (benign race, re-inserts are idempotent)
+    _cache.pop(key, None)
+    return None
+
 
-    async def set(self, key: str, value: Any, ttl: float = 60.0) -> None:
-        exp = self._now() + ttl
-        self._data[key] = (exp, value)
+async def cache_set(key: str, value: Any, ttl: float = 60.0) -> None:
+    exp = clock.NOW + ttl
+    _cache[key] = (exp, value)
+    heapq.heappush(_exp_heap, (exp, key))
 
-    async def get_or_set(self, key: str, loader: Callable[[], Awaitable[Any]], ttl: float = 60.0) -> Any:
-        # fast path
-        val = await self.get(key)
+
+async def cache_get_or_set(key: str, loader: Callable[[], Awaitable[Any]], ttl: float = 60.0) -> Any:
+    # fast path
+    val = await cache_get(key)
+    if val is not None:
+        return val
+    # hash-striped lock dedupes loaders; unrelated keys sharing a stripe
+    # is an acceptable false-sharing trade for constant memory
+    async with _stripes[hash(key) & (_NUM_STRIPES - 1)]:
+        # another check after acquiring lock
+        val = await cache_get(key)
         if val is not None:
             return val
-        # per-key lock to dedupe loaders
-        async with self._global_lock:
-            lock = self._locks.get(key)
-            if lock is None:
-                lock = asyncio.Lock()
-                self._locks[key] = lock
-        async with lock:
-            # another check after acquiring lock
-            val = await self.get(key)
-            if val is not None:
-                return val
-            val = await loader()
-            await self.set(key, val, ttl)
-            # cleanup locks to avoid growth
-            async with self._global_lock:
-                self._locks.pop(key, None)
-            return val
+        val = await loader()
+        await cache_set(key, val, ttl)
+        return val
+
+
+async def cache_clear() -> None:
+    _cache.clear()
+    _exp_heap.clear()
+
 
-    async def clear(self):
-        self._data.clear()
+async def _sweep():
+    while True:
+        await asyncio.sleep(SWEEP_INTERVAL)
+        now = clock.NOW
+        while _exp_heap and _exp_heap[0][0] < now:
+            exp, key = heapq.heappop(_exp_heap)
+            cur = _cache.get(key)
+            # only drop if the live entry is the expired one; a re-set key
+            # has a fresher expiry and its heap entry is simply stale
+            if cur and cur[0] <= now:
+                _cache.pop(key, None)
 
 
-_default_cache = TTLCache()
+def start_sweeper() -> None:
+    """Start the periodic expiry sweep; idempotent."""
+    global _sweep_task
+    if _sweep_task is None or _sweep_task.done():
+        _sweep_task = asyncio.ensure_future(_sweep())
 
-async def cache_get(key: str):
-    return await _default_cache.get(key)
 
-async def cache_get_or_set(key: str, loader: Callable[[], Awaitable[Any]], ttl: float = 60.0):
-    return await _default_cache.get_or_set(key, loader, ttl)
+def stop_sweeper() -> None:
+    """Cancel the expiry sweep; idempotent."""
+    global _sweep_task
+    if _sweep_task is not None:
+        _sweep_task.cancel()
+        _sweep_task = None
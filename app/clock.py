@@ -0,0 +1,37 @@
+"""Coarse cached clock for hot-path freshness checks.
+
+A background task refreshes NOW every TICK_INTERVAL so request paths can
+read a module attribute instead of calling time.monotonic() per check.
+Cache TTLs and circuit-breaker windows tolerate the ~10ms staleness; code
+that needs a wall-clock timestamp should keep calling time.time().
+"""
+import asyncio
+import time
+
+TICK_INTERVAL = 0.01
+
+NOW: float = time.monotonic()
+_task: asyncio.Task | None = None
+
+
+async def _tick():
+    global NOW
+    while True:
+        NOW = time.monotonic()
+        await asyncio.sleep(TICK_INTERVAL)
+
+
+def start() -> None:
+    """Start the ticker on the running loop; idempotent."""
+    global NOW, _task
+    NOW = time.monotonic()
+    if _task is None or _task.done():
+        _task = asyncio.ensure_future(_tick())
+
+
+def stop() -> None:
+    """Cancel the ticker; idempotent."""
+    global _task
+    if _task is not None:
+        _task.cancel()
+        _task = None
@@ -27,3 +27,47 @@ config = Config(
     DEMO_MODE=_bool_env("DEMO_MODE", default=True),
     QUERY_TIMEOUT_SEC=int(os.getenv("QUERY_TIMEOUT_SEC", "5")),
 )
+
+# Module-level knobs shared by the app, worker pools and downstream client.
+# Frozen at import so hot paths read plain module attributes.
+
+POSTGRES_DSN = config.POSTGRES_DSN
+DEMO_MODE = config.DEMO_MODE
+POOL_MIN = config.POOL_MIN
+POOL_MAX = config.POOL_MAX
+
+# default-executor size for any blocking work dispatched via run_in_executor;
+# the stdlib default of min(32, cpus + 4) is too small for I/O-heavy apps
+THREAD_POOL_SIZE = int(os.getenv("THREAD_POOL_SIZE", "64"))
+
+# queue / worker pool
+QUEUE_MAXSIZE = int(os.getenv("QUEUE_MAXSIZE", "10"))
+WORKER_COUNT = int(os.getenv("WORKER_COUNT", "3"))
+WORKER_BATCH = int(os.getenv("WORKER_BATCH", "8"))
+TASK_TIMEOUT = float(os.getenv("TASK_TIMEOUT", "2.0"))
+RETRY_AFTER_SEC = int(os.getenv("RETRY_AFTER_SEC", "1"))
+MAX_RETRIES = int(os.getenv("MAX_RETRIES", "3"))
+BACKOFF_BASE = float(os.getenv("BACKOFF_BASE", "0.1"))
+# retry backoff by attempt number, derived from the two knobs above;
+# attempts are bounded so a tuple index beats recomputing the delay per
+# retry. Callers clamp to the last entry for attempts past MAX_RETRIES.
+BACKOFF_SCHEDULE = tuple(BACKOFF_BASE * a for a in range(MAX_RETRIES + 1))
+METRICS_PORT = int(os.getenv("METRICS_PORT", "8001"))
+METRICS_SAMPLE_INTERVAL = float(os.getenv("METRICS_SAMPLE_INTERVAL", "0.1"))
+JOB_TIMEOUT = float(os.getenv("JOB_TIMEOUT", "5.0"))
+# jobs enqueued per batch tuple; bursts larger than this split into chunks
+MAX_BATCH = int(os.getenv("MAX_BATCH", "64"))
+
+# circuit breaker
+CB_FAILURE_THRESHOLD = int(os.getenv("CB_FAILURE_THRESHOLD", "5"))
+CB_RESET_SECONDS = float(os.getenv("CB_RESET_SECONDS", "5"))
+CIRCUIT_FAILURE_THRESHOLD = CB_FAILURE_THRESHOLD
+CIRCUIT_RESET_TIMEOUT = CB_RESET_SECONDS
+
+# simulated downstream
+DOWNSTREAM_TIMEOUT = float(os.getenv("DOWNSTREAM_TIMEOUT", "1.0"))
+DOWNSTREAM_FAIL_RATE = float(os.getenv("DOWNSTREAM_FAIL_RATE", "0.1"))
+DOWNSTREAM_JITTER = float(os.getenv("DOWNSTREAM_JITTER", "0.1"))
+
+# read cache
+CACHE_TTL = float(os.getenv("CACHE_TTL", "5"))
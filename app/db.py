@@ -1,5 +1,6 @@
 import os
 import asyncio
+from dataclasses import replace
 from typing import Any, Optional
 
 _pool: Optional[Any] = None
@@ -27,21 +28,8 @@ try:
 except Exception:  # pragma: no cover - optional
     asyncpg = None
 
-
-class AsyncPGPoolWrapper:
-    def __init__(self, pool: Any):
-        self._pool = pool
-
-    async def fetchrow(self, query: str, *args):
-        async with self._pool.acquire() as conn:
-            return await conn.fetchrow(query, *args)
-
-    async def execute(self, query: str, *args):
-        async with self._pool.acquire() as conn:
-            return await conn.execute(query, *args)
-
-    async def close(self):
-        await self._pool.close()
+from .adapters.postgres import PostgresAdapter
+from .config import config as _config
 
 
 async def init_db(dsn: Optional[str] = None, min_size: int = 1, max_size: int = 10):
@@ -57,8 +45,10 @@ async def init_db(dsn: Optional[str] = None, min_size: int = 1, max_size: int =
         _pool = NoDBPool()
         return _pool
 
-    # create a real asyncpg pool
-    _pool = AsyncPGPoolWrapper(await asyncpg.create_pool(dsn, min_size=min_size, max_size=max_size))
+    # real DSN: the asyncpg-backed adapter creates its pool lazily on first
+    # use; an explicit DSN here always means a real database
+    cfg = replace(_config, DEMO_MODE=False)
+    _pool = PostgresAdapter(cfg=cfg, dsn=dsn, min_size=min_size, max_size=max_size)
     return _pool
 
 
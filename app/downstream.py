@@ -2,11 +2,47 @@ import asyncio
 import random
 import time
 from typing import Any
-from . import config
+from . import clock, config
+
+# numpy fills the sample buffer in one C call when present
+try:
+    import numpy as np
+except Exception:  # pragma: no cover - optional
+    np = None
+
+_JITTER_SIZE = 4096  # power of two so advancing the index is a mask
+
+
+class JitterBuffer:
+    """Ring of pre-generated uniform [0,1) floats.
+
+    next() is an index bump plus list load instead of a Mersenne Twister
+    call per sample. The buffer cycles; reusing 4096 samples is fine for
+    latency jitter and failure-rate simulation.
+    """
+
+    def __init__(self, size: int = _JITTER_SIZE):
+        self._mask = size - 1
+        self._idx = 0
+        if np is not None:
+            self._buf = np.random.random(size).tolist()
+        else:
+            self._buf = [random.random() for _ in range(size)]
+
+    def next(self) -> float:
+        i = self._idx
+        self._idx = (i + 1) & self._mask
+        return self._buf[i]
+
 
 class DownstreamError(Exception):
     pass
 
+
+# shared backoff table; defined once in config from BACKOFF_BASE/MAX_RETRIES
+_BACKOFF = config.BACKOFF_SCHEDULE
+
+
 class CircuitBreaker:
     def __init__(self, fail_threshold: int, reset_seconds: int):
         self.fail_threshold = fail_threshold
@@ -20,12 +56,12 @@ class CircuitBreaker:
     def record_failure(self) -> None:
         self.fail_count += 1
         if self.fail_count >= self.fail_threshold:
-            self.opened_at = time.time()
+            self.opened_at = clock.NOW
 
     def is_open(self) -> bool:
         if self.opened_at == 0:
             return False
-        if time.time() - self.opened_at > self.reset_seconds:
+        if clock.NOW - self.opened_at > self.reset_seconds:
             # move to half-open
             self.fail_count = 0
             self.opened_at = 0
@@ -37,11 +73,12 @@ class DownstreamClient:
         self.timeout = timeout or config.DOWNSTREAM_TIMEOUT
         self.retries = retries
         self.cb = CircuitBreaker(config.CB_FAILURE_THRESHOLD, config.CB_RESET_SECONDS)
+        self._jitter = JitterBuffer()
 
     async def _do_call(self, payload: dict) -> dict:
-        # Simulate network latency and random failure
-        await asyncio.sleep(random.uniform(0.01, 0.2))
-        if random.random() < config.DOWNSTREAM_FAIL_RATE:
+        # Simulate network latency and random failure from the prefilled buffer
+        await asyncio.sleep(0.01 + self._jitter.next() * 0.19)
+        if self._jitter.next() < config.DOWNSTREAM_FAIL_RATE:
             raise DownstreamError("simulated downstream failure")
         # echo back with some processing
         return {"result": payload.get("value", None), "processed_at": time.time()}
@@ -52,14 +89,16 @@ class DownstreamClient:
         last_exc: Exception | None = None
         for attempt in range(1, self.retries + 2):
             try:
-                return await asyncio.wait_for(self._do_call(payload), timeout=self.timeout)
+                # asyncio.timeout avoids wait_for's wrapper Task per attempt
+                async with asyncio.timeout(self.timeout):
+                    return await self._do_call(payload)
             except Exception as exc:
                 last_exc = exc
                 # record failure and maybe open circuit
                 self.cb.record_failure()
                 if isinstance(exc, DownstreamError) and str(exc) == "circuit-open":
                     raise exc
-                jitter = random.uniform(0, config.DOWNSTREAM_JITTER)
-                await asyncio.sleep(jitter)
+                backoff = _BACKOFF[min(attempt, len(_BACKOFF) - 1)]
+                await asyncio.sleep(backoff + self._jitter.next() * config.DOWNSTREAM_JITTER)
                 continue
         raise last_exc or DownstreamError("unknown")
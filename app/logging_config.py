@@ -3,6 +3,22 @@ import json
 import sys
 from datetime import datetime
 
+# orjson is a C-level encoder ~5-10x faster than stdlib json; fall back if absent
+try:
+    import orjson
+except Exception:  # pragma: no cover - optional
+    orjson = None
+
+# standard LogRecord attributes to skip when copying extras; frozenset gives
+# O(1) membership instead of a tuple scan per attribute
+_STD_ATTRS = frozenset({
+    "name", "msg", "args", "levelname", "levelno", "pathname", "filename",
+    "module", "exc_info", "exc_text", "stack_info", "lineno", "funcName",
+    "created", "msecs", "relativeCreated", "thread", "threadName",
+    "processName", "process", "taskName",
+})
+
+
 class JSONFormatter(logging.Formatter):
     def format(self, record: logging.LogRecord) -> str:
         payload = {
@@ -14,16 +30,15 @@ class JSONFormatter(logging.Formatter):
         # include exception info if present
         if record.exc_info:
             payload["exc"] = self.formatException(record.exc_info)
-        # include any extra attributes
+        # include any extra attributes; default=str handles non-serializable
+        # values in the single encode pass below
         for k, v in record.__dict__.items():
-            if k in ("name", "msg", "args", "levelname", "levelno", "exc_info", "exc_text", "stack_info", "created", "msecs", "relativeCreated", "thread", "threadName", "processName", "process"):
+            if k in _STD_ATTRS:
                 continue
-            try:
-                json.dumps(v)
-                payload[k] = v
-            except Exception:
-                payload[k] = str(v)
-        return json.dumps(payload, ensure_ascii=False)
+            payload[k] = v
+        if orjson is not None:
+            return orjson.dumps(payload, default=str).decode()
+        return json.dumps(payload, ensure_ascii=False, default=str)
 
 
 def init_logging(level: str = "INFO") -> None:
@@ -1,4 +1,8 @@
-from prometheus_client import Counter, Gauge, Histogram
+import asyncio
+import os
+import time
+
+from prometheus_client import Counter, Gauge, Histogram, generate_latest, CONTENT_TYPE_LATEST
 
 # Prometheus metrics
 QUEUE_DEPTH = Gauge('app_queue_depth', 'Number of items in the work queue')
@@ -25,3 +29,74 @@ def inc_rejected():
 
 def observe_latency(sec: float):
     TASK_LATENCY.observe(sec)
+
+
+# HTTP request metrics. .labels() is a dict lookup plus a lock per call, so
+# the middleware fetches pre-bound children from these caches and the hot
+# path is a plain dict get + .inc()/.observe(). Paths are matched route
+# templates (unmatched URLs share one sentinel), so normal cardinality is a
+# handful of routes; should the cap be hit anyway, further new labelsets
+# collapse into an "overflow" path instead of growing the registry — and
+# the /metrics render cost — without bound.
+REQUEST_COUNT = Counter('app_http_requests_total', 'HTTP requests', ['method', 'path', 'status'])
+REQUEST_LATENCY = Histogram('app_http_request_latency_seconds', 'HTTP request latency in seconds', ['method', 'path'])
+INPROGRESS = Gauge('app_http_requests_in_progress', 'HTTP requests currently in flight')
+
+_CHILD_CAP = 1024
+_count_children: dict = {}
+_lat_children: dict = {}
+
+
+def count_child(method: str, path: str, status: str):
+    key = (method, path, status)
+    child = _count_children.get(key)
+    if child is None:
+        if len(_count_children) >= _CHILD_CAP:
+            key = (method, "overflow", status)
+            child = _count_children.get(key)
+            if child is not None:
+                return child
+            path = "overflow"
+        child = REQUEST_COUNT.labels(method, path, status)
+        _count_children[key] = child
+    return child
+
+
+def latency_child(method: str, path: str):
+    key = (method, path)
+    child = _lat_children.get(key)
+    if child is None:
+        if len(_lat_children) >= _CHILD_CAP:
+            key = (method, "overflow")
+            child = _lat_children.get(key)
+            if child is not None:
+                return child
+            path = "overflow"
+        child = REQUEST_LATENCY.labels(method, path)
+        _lat_children[key] = child
+    return child
+
+
+# /metrics serves bytes cached for METRICS_CACHE_TTL. generate_latest walks
+# every collector and formats every bucket, so with several scrapers only the
+# first request per TTL pays that cost — and pays it in the executor, off the
+# event loop. Rendering on demand replaces the earlier fixed-interval
+# refresher task, which re-rendered even when nothing was scraping.
+METRICS_CACHE_TTL = float(os.getenv("METRICS_CACHE_TTL", "1.0"))
+
+_snapshot: bytes = b""
+_snapshot_ts = 0.0
+_regen_lock = asyncio.Lock()
+
+
+async def latest_snapshot() -> bytes:
+    global _snapshot, _snapshot_ts
+    if time.monotonic() - _snapshot_ts < METRICS_CACHE_TTL and _snapshot:
+        return _snapshot
+    async with _regen_lock:
+        # another scrape may have regenerated while we waited
+        if time.monotonic() - _snapshot_ts >= METRICS_CACHE_TTL or not _snapshot:
+            loop = asyncio.get_running_loop()
+            _snapshot = await loop.run_in_executor(None, generate_latest)
+            _snapshot_ts = time.monotonic()
+    return _snapshot
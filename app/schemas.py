@@ -2,7 +2,9 @@ from pydantic import BaseModel, Field
 from typing import Optional
 
 class ProcessRequest(BaseModel):
-    payload: str = Field(..., example="do work")
+    # bytes keeps the downstream reversal a single memcpy instead of a
+    # per-codepoint str walk
+    payload: bytes = Field(..., example="do work")
 
 class ProcessResponse(BaseModel):
     id: str
@@ -12,5 +14,9 @@ class Health(BaseModel):
     status: str = "ok"
     uptime: Optional[float] = None
 
+class TaskPayload(BaseModel):
+    task: object | None = None
+    meta: dict | None = None
+
 class ErrorModel(BaseModel):
     detail: str
@@ -1,10 +1,12 @@
+import os
 from contextlib import asynccontextmanager, contextmanager
 
 # Make OpenTelemetry optional; provide no-op fallback
 try:
     from opentelemetry import trace
     from opentelemetry.sdk.trace import TracerProvider
-    from opentelemetry.sdk.trace.export import BatchSpanProcessor, ConsoleSpanExporter
+    from opentelemetry.sdk.trace.export import BatchSpanProcessor
+    from opentelemetry.sdk.trace.sampling import ParentBased, TraceIdRatioBased
     _otel_available = True
 except Exception:
     trace = None
@@ -12,8 +14,20 @@ except Exception:
 
 
 if _otel_available:
-    provider = TracerProvider()
-    provider.add_span_processor(BatchSpanProcessor(ConsoleSpanExporter()))
+    # head-sample a small ratio of traces (children follow their parent);
+    # recording every span costs export work on every hot-path request
+    _ratio = float(os.getenv("OTEL_SAMPLING", "0.01"))
+    provider = TracerProvider(sampler=ParentBased(TraceIdRatioBased(_ratio)))
+    # only export if a collector endpoint is configured; the old
+    # ConsoleSpanExporter stringified every span to stdout, which dominates
+    # traced hot paths under load
+    _endpoint = os.getenv("OTEL_EXPORTER_OTLP_ENDPOINT")
+    if _endpoint:
+        try:
+            from opentelemetry.exporter.otlp.proto.grpc.trace_exporter import OTLPSpanExporter
+            provider.add_span_processor(BatchSpanProcessor(OTLPSpanExporter(endpoint=_endpoint)))
+        except Exception:  # pragma: no cover - optional exporter package
+            pass
     trace.set_tracer_provider(provider)
     _tracer = trace.get_tracer(__name__)
 
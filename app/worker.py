@@ -2,13 +2,25 @@ import asyncio
 import time
 import random
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any, Callable
 from prometheus_client import start_http_server, Gauge, Counter
-import config
+from . import config
+from .downstream import JitterBuffer
+
+try:
+    import asyncpg
+except Exception:  # pragma: no cover - optional
+    asyncpg = None
 
 logger = logging.getLogger("worker")
 logging.basicConfig(level=logging.INFO)
 
+# prefilled uniform samples instead of the random module's locked Mersenne
+# Twister; one buffer covers latency, failure-injection and backoff jitter
+_jitter = JitterBuffer()
+_fast_rand = _jitter.next
+
 # Metrics
 QUEUE_DEPTH = Gauge("queue_depth", "Current depth of task queue")
 WORKER_BUSY = Gauge("worker_occupied", "Number of busy workers")
@@ -22,73 +34,119 @@ class CircuitOpenError(Exception):
 
 
 class CircuitBreaker:
+    # monotonic_ns returns an int straight from the vDSO clock; time.time()
+    # would allocate a float on every is_open() check.
+    #
+    # Failures are counted over a sliding window of one-second buckets, so
+    # the breaker opens on "threshold failures within WINDOW seconds" rather
+    # than "threshold failures since the last success" — occasional failures
+    # mixed into a long success streak age out instead of accumulating.
+    WINDOW = 10
+
     def __init__(self, threshold: int, reset_timeout: float):
         self.threshold = threshold
-        self.reset_timeout = reset_timeout
-        self.failures = 0
-        self.opened_at = None
+        self.reset_timeout_ns = int(reset_timeout * 1e9)
+        self.opened_at_ns = None
+        self._buckets = [0] * self.WINDOW
+        self._bucket_ts = int(time.monotonic())
+
+    def _advance(self):
+        now = int(time.monotonic())
+        delta = now - self._bucket_ts
+        if delta > 0:
+            if delta >= self.WINDOW:
+                self._buckets = [0] * self.WINDOW
+            else:
+                del self._buckets[:delta]
+                self._buckets.extend([0] * delta)
+            self._bucket_ts = now
+
+    @property
+    def failures(self) -> int:
+        self._advance()
+        return sum(self._buckets)
 
     def record_success(self):
-        self.failures = 0
-        self.opened_at = None
+        # a single success no longer wipes the count; stale failures simply
+        # fall out of the window
+        pass
 
     def record_failure(self):
-        self.failures += 1
-        if self.failures >= self.threshold and self.opened_at is None:
-            self.opened_at = time.time()
+        self._advance()
+        self._buckets[-1] += 1
+        if self.opened_at_ns is None and sum(self._buckets) >= self.threshold:
+            self.opened_at_ns = time.monotonic_ns()
             logger.warning("circuit opened (threshold reached)")
 
     def is_open(self) -> bool:
-        if self.opened_at is None:
+        if self.opened_at_ns is None:
             return False
-        if time.time() - self.opened_at >= self.reset_timeout:
+        if time.monotonic_ns() - self.opened_at_ns >= self.reset_timeout_ns:
             # reset (half-open simplified behavior)
             logger.info("circuit reset timeout elapsed; allowing trial")
-            self.failures = 0
-            self.opened_at = None
+            self._buckets = [0] * self.WINDOW
+            self._bucket_ts = int(time.monotonic())
+            self.opened_at_ns = None
             return False
         return True
 
 
 class PostgresAdapter:
     """Simple adapter that supports demo-mode toggles and integrates with a CircuitBreaker.
-    In demo mode writes are simulated; otherwise a blocking DB interaction is executed in an executor.
+    In demo mode writes are simulated; otherwise writes go through a lazily
+    created asyncpg pool, so the event loop never waits on an executor thread.
     """
 
+    # demo schedule length; power of two so advancing the index is a mask
+    _DEMO_SEQ = 4096
+
     def __init__(self, dsn: str, demo_mode: bool, circuit: CircuitBreaker):
         self.dsn = dsn
         self.demo = demo_mode
         self.circuit = circuit
+        self._pool = None
+        self._pool_lock = asyncio.Lock()
+        if demo_mode:
+            # precomputed (sleep, fail) schedule: a demo write is a masked
+            # index bump plus two list loads, no RNG call at all (init is
+            # cold, so plain random is fine here)
+            self._seq_idx = 0
+            self._demo_sleeps = [random.uniform(0.01, 0.05) for _ in range(self._DEMO_SEQ)]
+            self._demo_fails = [random.random() < 0.05 for _ in range(self._DEMO_SEQ)]
+
+    async def _ensure_pool(self):
+        if self._pool is None:
+            if asyncpg is None:
+                raise RuntimeError("asyncpg is required when demo mode is off")
+            async with self._pool_lock:
+                if self._pool is None:
+                    self._pool = await asyncpg.create_pool(self.dsn, min_size=config.POOL_MIN, max_size=config.POOL_MAX)
+                    logger.info("db pool initialized")
+        return self._pool
 
     async def write(self, payload: Any):
         if self.circuit.is_open():
             raise CircuitOpenError("circuit is open")
 
-        # Demo mode: simulate latency and occasional errors
+        # Demo mode: simulate latency and occasional errors from the schedule
         if self.demo:
-            await asyncio.sleep(random.uniform(0.01, 0.05))
-            # introduce a small chance of failure to exercise retries/circuit-breaker
-            if random.random() < 0.05:
+            i = self._seq_idx
+            self._seq_idx = (i + 1) & (self._DEMO_SEQ - 1)
+            await asyncio.sleep(self._demo_sleeps[i])
+            # small chance of failure to exercise retries/circuit-breaker
+            if self._demo_fails[i]:
                 self.circuit.record_failure()
                 raise RuntimeError("simulated db failure")
             self.circuit.record_success()
             return {"status": "ok", "demo": True}
 
-        # Non-demo: perform a blocking DB op in executor to keep asyncio loop responsive
-        # Keep implementation compact: simulate blocking work as placeholder for real DB call
-        loop = asyncio.get_event_loop()
-
-        def blocking_db_call(payload):
-            time.sleep(0.05 + random.random() * 0.05)
-            # In a real implementation you'd use psycopg2/asyncpg here using self.dsn
-            if random.random() < 0.02:
-                raise RuntimeError("db insert failed")
-            return {"status": "ok", "demo": False}
-
+        # Non-demo: native asyncpg, no thread-pool hop per write
         try:
-            result = await loop.run_in_executor(None, blocking_db_call, payload)
+            pool = await self._ensure_pool()
+            async with pool.acquire() as conn:
+                await conn.execute("INSERT INTO tasks(payload) VALUES($1)", str(payload))
             self.circuit.record_success()
-            return result
+            return {"status": "ok", "demo": False}
         except Exception:
             self.circuit.record_failure()
             raise
@@ -110,7 +168,9 @@ class WorkerPool:
         self.backoff_base = backoff_base
         self._tasks = []
         self._stopping = False
+        # plain int bumped around jobs; only the sampler writes the gauges
         self.occupied = 0
+        self._sampler_task = None
         self.circuit = CircuitBreaker(config.CIRCUIT_FAILURE_THRESHOLD, config.CIRCUIT_RESET_TIMEOUT)
         self.adapter = PostgresAdapter(config.POSTGRES_DSN, demo_mode, self.circuit)
         # start metrics server in background thread
@@ -118,13 +178,29 @@ class WorkerPool:
         logger.info(f"metrics available on :{metrics_port}")
 
     async def start(self):
+        # any residual blocking work (sync drivers, file IO) shares the default
+        # executor; size it explicitly, the stdlib default is too small under load
+        asyncio.get_running_loop().set_default_executor(
+            ThreadPoolExecutor(max_workers=config.THREAD_POOL_SIZE, thread_name_prefix="worker-io"))
         for _ in range(self.workers):
             t = asyncio.create_task(self._worker_loop())
             self._tasks.append(t)
+        self._sampler_task = asyncio.create_task(self._sample_metrics())
         logger.info(f"started {self.workers} workers")
 
+    async def _sample_metrics(self):
+        # gauge writes are a Prometheus lock + dict write each; pay them once
+        # per interval instead of per submit/job
+        while True:
+            QUEUE_DEPTH.set(self.queue.qsize())
+            WORKER_BUSY.set(self.occupied)
+            await asyncio.sleep(config.METRICS_SAMPLE_INTERVAL)
+
     async def stop(self):
         self._stopping = True
+        if self._sampler_task is not None:
+            self._sampler_task.cancel()
+            self._sampler_task = None
         # wake workers
         for _ in range(len(self._tasks)):
             await self.queue.put(None)
@@ -135,11 +211,9 @@ class WorkerPool:
         try:
             if block:
                 await asyncio.wait_for(self.queue.put(payload), timeout=timeout)
-                QUEUE_DEPTH.set(self.queue.qsize())
                 return True
             else:
                 self.queue.put_nowait(payload)
-                QUEUE_DEPTH.set(self.queue.qsize())
                 return True
         except (asyncio.QueueFull, asyncio.TimeoutError):
             REJECTED.inc()
@@ -149,17 +223,14 @@ class WorkerPool:
     async def _worker_loop(self):
         while True:
             item = await self.queue.get()
-            QUEUE_DEPTH.set(self.queue.qsize())
             if item is None:
                 # shutdown sentinel
                 break
             self.occupied += 1
-            WORKER_BUSY.set(self.occupied)
             try:
                 await self._process_with_retries(item)
             finally:
                 self.occupied -= 1
-                WORKER_BUSY.set(self.occupied)
                 self.queue.task_done()
             if self._stopping:
                 break
@@ -190,7 +261,7 @@ class WorkerPool:
                     return
                 backoff = self.backoff_base * (2 ** (attempt - 1))
                 # jitter
-                backoff = backoff * (0.8 + random.random() * 0.4)
+                backoff = backoff * (0.8 + _fast_rand() * 0.4)
                 await asyncio.sleep(backoff)
 
 
@@ -1,7 +1,8 @@
 import asyncio
+import itertools
 import logging
+import os
 import time
-import uuid
 from typing import Any
 from prometheus_client import Counter, Gauge
 from . import config
@@ -11,6 +12,20 @@ log = logging.getLogger("worker_pool")
 
 QUEUE_FULL = "queue_full"
 
+# items a worker drains per wakeup beyond the first; for short jobs this
+# amortizes the queue.get wakeup across up to 16 jobs
+DRAIN_BATCH = 16
+
+# job ids: a per-process prefix (start nanos + pid) plus a counter. uuid4
+# costs an os.urandom syscall and hex formatting per call; this is one
+# f-string, and the pid keeps ids unique across processes
+_ID_PREFIX = f"{time.time_ns():x}{os.getpid():x}"
+_id_counter = itertools.count()
+
+
+def _next_job_id() -> str:
+    return f"{_ID_PREFIX}-{next(_id_counter):x}"
+
 metric_jobs_received = Counter("jobs_received_total", "Jobs received")
 metric_jobs_failed = Counter("jobs_failed_total", "Jobs failed")
 metric_jobs_processed = Counter("jobs_processed_total", "Jobs processed")
@@ -22,69 +37,182 @@ metric_circuit_open = Gauge("circuit_open", "Circuit breaker open (0/1)")
 class QueueFullError(Exception):
     pass
 
+
+class _Slots(asyncio.Semaphore):
+    """Semaphore with non-blocking acquire for load-shedding submitters.
+
+    Safe without locking: the event loop is single-threaded and there is no
+    await between the check and the decrement.
+    """
+
+    def acquire_nowait(self, n: int = 1) -> None:
+        if self._value < n:
+            raise QueueFullError()
+        self._value -= n
+
+    def release_many(self, n: int) -> None:
+        # asyncio.Semaphore.release takes no count; wakes one waiter per slot
+        for _ in range(n):
+            self.release()
+
+
 class WorkerPool:
     def __init__(self, queue_size: int, workers: int, downstream: DownstreamClient):
-        self.queue: asyncio.Queue[tuple[str, dict, asyncio.Future]] = asyncio.Queue(maxsize=queue_size)
+        # capacity is enforced by the slot semaphore, not the queue, so a
+        # submit under backpressure is a plain counter check instead of a
+        # wait_for-wrapped queue.put (one Task allocation per attempt)
+        self.queue: asyncio.Queue[tuple[str, dict, asyncio.Future]] = asyncio.Queue()
+        self.capacity = queue_size
+        self._slots = _Slots(queue_size)
         self.workers = workers
         self.downstream = downstream
         self._tasks: list[asyncio.Task] = []
         self._running = False
+        # plain int maintained around downstream calls; the gauge is only
+        # written by the background sampler, never on the job path
+        self._active = 0
+        self._sampler_task: asyncio.Task | None = None
+        # cached at start(); saves an asyncio.get_running_loop() per submit
+        self._loop: asyncio.AbstractEventLoop | None = None
 
     async def start(self) -> None:
         if self._running:
             return
         self._running = True
+        self._loop = asyncio.get_running_loop()
         for _ in range(self.workers):
             t = asyncio.create_task(self._worker_loop())
             self._tasks.append(t)
+        self._sampler_task = asyncio.create_task(self._sample_metrics())
         log.info("worker pool started", extra={"workers": self.workers})
 
     async def stop(self) -> None:
         self._running = False
+        if self._sampler_task is not None:
+            self._sampler_task.cancel()
+            self._sampler_task = None
         for t in self._tasks:
             t.cancel()
         await asyncio.gather(*self._tasks, return_exceptions=True)
         self._tasks.clear()
 
+    async def _sample_metrics(self) -> None:
+        # Gauge.set is a lock + dict write; sampling every METRICS_SAMPLE_INTERVAL
+        # keeps that cost O(1) per interval instead of O(jobs)
+        while True:
+            metric_queue_size.set(self.queue.qsize())
+            metric_active_workers.set(self._active)
+            await asyncio.sleep(config.METRICS_SAMPLE_INTERVAL)
+
     async def submit(self, payload: dict, timeout: float | None = None) -> str:
         metric_jobs_received.inc()
-        job_id = uuid.uuid4().hex
-        fut: asyncio.Future = asyncio.get_running_loop().create_future()
+        job_id = _next_job_id()
+        loop = self._loop
+        if loop is None:
+            loop = self._loop = asyncio.get_running_loop()
+        fut: asyncio.Future = loop.create_future()
         try:
-            # try put with small timeout for backpressure
+            # acquire a slot, optionally waiting for backpressure to clear
             if timeout is None:
-                self.queue.put_nowait((job_id, payload, fut))
+                self._slots.acquire_nowait()
             else:
-                await asyncio.wait_for(self.queue.put((job_id, payload, fut)), timeout=timeout)
-            metric_queue_size.set(self.queue.qsize())
-            return job_id
-        except (asyncio.QueueFull, asyncio.TimeoutError):
+                await asyncio.wait_for(self._slots.acquire(), timeout=timeout)
+        except (QueueFullError, asyncio.TimeoutError):
             metric_jobs_failed.inc()
             raise QueueFullError()
+        self.queue.put_nowait((job_id, payload, fut))
+        return job_id
+
+    def submit_fire_and_forget(self, payload: dict) -> str:
+        """Enqueue without a result Future.
+
+        Callers that never await the outcome (the /enqueue handler) skip the
+        Future allocation and its GC cost entirely; workers see fut=None.
+        """
+        metric_jobs_received.inc()
+        job_id = _next_job_id()
+        try:
+            self._slots.acquire_nowait()
+        except QueueFullError:
+            metric_jobs_failed.inc()
+            raise
+        self.queue.put_nowait((job_id, payload, None))
+        return job_id
+
+    async def submit_many(self, payloads: list[dict]) -> list[str]:
+        """Enqueue a burst of payloads as batch tuples.
+
+        A batch of N jobs becomes ceil(N / MAX_BATCH) queue items instead of
+        N, so the queue put/get and counter costs are paid once per chunk,
+        but capacity is accounted per job — the batch path obeys the same
+        queue_size bound as single submits. The burst is accepted or
+        rejected as a whole (no await between the check and the puts), and
+        since callers only receive job ids, jobs are enqueued without
+        Futures like submit_fire_and_forget.
+        """
+        if not payloads:
+            return []
+        try:
+            self._slots.acquire_nowait(len(payloads))
+        except QueueFullError:
+            metric_jobs_failed.inc(len(payloads))
+            raise
+        metric_jobs_received.inc(len(payloads))
+        ids: list[str] = []
+        for i in range(0, len(payloads), config.MAX_BATCH):
+            chunk = payloads[i:i + config.MAX_BATCH]
+            chunk_ids = [_next_job_id() for _ in chunk]
+            self.queue.put_nowait((chunk_ids, chunk, None))
+            ids.extend(chunk_ids)
+        return ids
+
+    async def _run_job(self, job_id: str, payload: dict, fut: asyncio.Future | None) -> None:
+        self._active += 1
+        try:
+            # call downstream with overall timeout
+            res = await asyncio.wait_for(self.downstream.call(payload), timeout=config.JOB_TIMEOUT)
+            metric_jobs_processed.inc()
+            if fut is not None:
+                fut.set_result(res)
+        except Exception as exc:
+            metric_jobs_failed.inc()
+            metric_downstream_errors.inc()
+            if getattr(self.downstream.cb, "is_open", lambda: False)():
+                metric_circuit_open.set(1)
+            else:
+                metric_circuit_open.set(0)
+            if fut is not None:
+                fut.set_exception(exc)
+            log.exception("job failed", extra={"job_id": job_id})
+        finally:
+            self._active -= 1
 
     async def _worker_loop(self) -> None:
         while self._running:
             try:
-                job_id, payload, fut = await self.queue.get()
-                metric_queue_size.set(self.queue.qsize())
-                metric_active_workers.inc()
-                try:
-                    # call downstream with overall timeout
-                    res = await asyncio.wait_for(self.downstream.call(payload), timeout=config.JOB_TIMEOUT)
-                    metric_jobs_processed.inc()
-                    fut.set_result(res)
-                except Exception as exc:
-                    metric_jobs_failed.inc()
-                    metric_downstream_errors.inc()
-                    if getattr(self.downstream.cb, "is_open", lambda: False)():
-                        metric_circuit_open.set(1)
-                    else:
-                        metric_circuit_open.set(0)
-                    fut.set_exception(exc)
-                    log.exception("job failed", extra={"job_id": job_id})
-                finally:
-                    metric_active_workers.dec()
-                    self.queue.task_done()
+                # block for the first item, then drain whatever is already
+                # queued so short jobs don't pay a get() wakeup each
+                batch = [await self.queue.get()]
+                for _ in range(DRAIN_BATCH - 1):
+                    try:
+                        batch.append(self.queue.get_nowait())
+                    except asyncio.QueueEmpty:
+                        break
+                for job_id, payload, fut in batch:
+                    try:
+                        if isinstance(job_id, list):
+                            # batch tuple from submit_many: one item covers N
+                            # fire-and-forget jobs
+                            for jid, pl in zip(job_id, payload):
+                                await self._run_job(jid, pl, None)
+                        else:
+                            await self._run_job(job_id, payload, fut)
+                    finally:
+                        self.queue.task_done()
+                        if isinstance(job_id, list):
+                            self._slots.release_many(len(job_id))
+                        else:
+                            self._slots.release()
             except asyncio.CancelledError:
                 break
             except Exception:
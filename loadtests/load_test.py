@@ -0,0 +1,185 @@
+"""Closed-loop asyncio load tester for the demo app.
+
+Spawns N worker coroutines that POST to /enqueue as fast as the server
+responds, and a reporter that prints RPS and latency percentiles every
+interval. Latencies are recorded into an HdrHistogram when `hdrh` is
+installed: record_value is O(1) and percentile reads need no sort and no
+snapshot copy. Without hdrh a bounded deque + sort fallback is used.
+
+Usage:
+    python loadtests/load_test.py --base-url http://localhost:8000 \
+        --concurrency 50 --duration 30
+"""
+import argparse
+import asyncio
+import time
+from collections import deque
+
+import httpx
+
+# HTTP/2 multiplexes every worker over few connections, but httpx only
+# speaks it when the h2 extra (httpx[http2]) is installed; fall back to
+# HTTP/1.1 rather than failing at client construction
+try:
+    import h2  # noqa: F401
+
+    _HTTP2 = True
+except ImportError:  # pragma: no cover - optional
+    _HTTP2 = False
+
+# uvloop lifts the event-loop ceiling of the generator itself; drop-in when
+# installed, stdlib loop otherwise
+try:
+    import uvloop
+
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+except ImportError:  # pragma: no cover - optional
+    pass
+
+# hdrh keeps percentiles in fixed buckets; O(1) record, O(1) query
+try:
+    from hdrh.histogram import HdrHistogram
+except ImportError:  # pragma: no cover - optional
+    HdrHistogram = None
+
+# optional self-metrics so the loadtester itself can be scraped
+try:
+    from prometheus_client import Counter, Histogram, start_http_server
+
+    prom_requests = Counter("loadtest_requests_total", "Requests sent")
+    prom_success = Counter("loadtest_success_total", "2xx responses")
+    prom_errors = Counter("loadtest_errors_total", "Non-2xx responses and transport errors")
+    prom_latency = Histogram("loadtest_latency_seconds", "Request latency in seconds")
+except ImportError:  # pragma: no cover - optional
+    start_http_server = None
+    prom_requests = prom_success = prom_errors = prom_latency = None
+
+counters = {"requests": 0, "success": 0, "rejected": 0, "errors": 0}
+
+# latency store: microseconds in the histogram, up to 60s, 3 sig figs
+if HdrHistogram is not None:
+    hist = HdrHistogram(1, 60_000_000, 3)
+else:
+    hist = None
+# fallback store is double-buffered: workers append to the active deque and
+# the reporter flips the index (one store, atomic under the GIL) and sorts
+# the idle buffer, so reports never copy the live one. Percentiles are then
+# per-window rather than cumulative.
+_lat_bufs: list[deque] = [deque(maxlen=100_000), deque(maxlen=100_000)]
+_lat_active = 0
+
+
+def record_latency(seconds: float) -> None:
+    if hist is not None:
+        hist.record_value(int(seconds * 1e6))
+    else:
+        _lat_bufs[_lat_active].append(seconds)
+    if prom_latency is not None:
+        prom_latency.observe(seconds)
+
+
+def percentiles() -> tuple[float, float, float]:
+    """Return (p50, p90, p99) in milliseconds."""
+    global _lat_active
+    if hist is not None:
+        return tuple(hist.get_value_at_percentile(p) / 1000.0 for p in (50, 90, 99))
+    idle = _lat_active
+    _lat_active = idle ^ 1
+    buf = _lat_bufs[idle]
+    lat_sorted = sorted(buf)
+    buf.clear()
+    if not lat_sorted:
+        return (0.0, 0.0, 0.0)
+    n = len(lat_sorted)
+    return tuple(lat_sorted[min(n - 1, int(n * p / 100))] * 1000.0 for p in (50, 90, 99))
+
+
+_FLUSH_EVERY = 100
+
+
+async def worker(client: httpx.AsyncClient, url: str, stop_at: float) -> None:
+    payload = {"task": "demo", "value": 42}
+    # accumulate into locals and flush periodically: the shared dict hashes
+    # and Prometheus locks are paid once per _FLUSH_EVERY requests, not per
+    # request
+    local_req = local_ok = local_rej = local_err = 0
+    local_lats: list[float] = []
+
+    def flush() -> None:
+        nonlocal local_req, local_ok, local_rej, local_err
+        counters["requests"] += local_req
+        counters["success"] += local_ok
+        counters["rejected"] += local_rej
+        counters["errors"] += local_err
+        if prom_requests is not None:
+            prom_requests.inc(local_req)
+            prom_success.inc(local_ok)
+            prom_errors.inc(local_err)
+        for lat in local_lats:
+            record_latency(lat)
+        local_lats.clear()
+        local_req = local_ok = local_rej = local_err = 0
+
+    try:
+        while time.monotonic() < stop_at:
+            start = time.monotonic()
+            local_req += 1
+            try:
+                resp = await client.post(url, json=payload)
+                local_lats.append(time.monotonic() - start)
+                if resp.status_code < 300:
+                    local_ok += 1
+                elif resp.status_code == 429:
+                    local_rej += 1
+                else:
+                    local_err += 1
+            except httpx.HTTPError:
+                local_err += 1
+            if local_req >= _FLUSH_EVERY:
+                flush()
+    finally:
+        flush()
+
+
+async def reporter(interval: float, stop_at: float) -> None:
+    last = dict(counters)
+    while time.monotonic() < stop_at:
+        await asyncio.sleep(interval)
+        cur = dict(counters)
+        rps = (cur["requests"] - last["requests"]) / interval
+        p50, p90, p99 = percentiles()
+        print(
+            f"rps={rps:8.1f} ok={cur['success']} rejected={cur['rejected']} "
+            f"errors={cur['errors']} p50={p50:.1f}ms p90={p90:.1f}ms p99={p99:.1f}ms"
+        )
+        last = cur
+
+
+async def main(args: argparse.Namespace) -> None:
+    stop_at = time.monotonic() + args.duration
+    url = args.base_url.rstrip("/") + "/enqueue"
+    # max_connections already bounds in-flight requests, so no extra
+    # semaphore; HTTP/2 multiplexes the workers over few sockets
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(http2=_HTTP2, limits=limits) as client:
+        tasks = [asyncio.create_task(worker(client, url, stop_at)) for _ in range(args.concurrency)]
+        tasks.append(asyncio.create_task(reporter(args.report_interval, stop_at)))
+        await asyncio.gather(*tasks, return_exceptions=True)
+    p50, p90, p99 = percentiles()
+    print(
+        f"total={counters['requests']} ok={counters['success']} rejected={counters['rejected']} "
+        f"errors={counters['errors']} p50={p50:.1f}ms p90={p90:.1f}ms p99={p99:.1f}ms"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=30.0)
+    parser.add_argument("--report-interval", type=float, default=5.0)
+    parser.add_argument("--prom-port", type=int, default=0, help="expose loadtester metrics on this port")
+    args = parser.parse_args()
+    if args.prom_port and start_http_server is not None:
+        start_http_server(args.prom_port)
+    asyncio.run(main(args))
@@ -1,8 +1,13 @@
 import os
 import random
-import re
 import gevent
 from locust import HttpUser, task, between
+from locust.contrib.fasthttp import FastHttpUser
+
+# generous explicit timeouts so slow responses under backpressure count as
+# server behavior, not client-side connection churn
+CONNECTION_TIMEOUT = float(os.getenv("CONNECTION_TIMEOUT", "10"))
+NETWORK_TIMEOUT = float(os.getenv("NETWORK_TIMEOUT", "30"))
 
 ENABLED = set([s.strip() for s in os.getenv("ENABLED_USERS", "steady,burst,ramp,monitor").split(",") if s.strip()])
 
@@ -12,18 +17,28 @@ def enabled(name):
 METRICS_PATH = os.getenv("METRICS_PATH", "/metrics")
 
 def parse_metrics(text):
-    # simple Prometheus-style parser for numeric gauges
+    # single-pass split parser for unlabelled numeric gauges; real scrape
+    # bodies run to thousands of lines, so no regex and no per-line strip —
+    # skip comments outright, rsplit once, let float() reject the rest
     out = {}
     for line in text.splitlines():
-        m = re.match(r"^(?P<name>[a-zA-Z0-9_]+)\s+(?P<val>[0-9+.eE-]+)$", line.strip())
-        if m:
-            out[m.group('name')] = float(m.group('val'))
+        if not line or line[0] == '#':
+            continue
+        try:
+            name, val = line.rsplit(' ', 1)
+            if ' ' in name or '{' in name:
+                continue
+            out[name] = float(val)
+        except ValueError:
+            continue
     return out
 
-class SteadyUser(HttpUser):
+class SteadyUser(FastHttpUser):
     """Steady, continuous arrival rate to exercise baseline throughput."""
     wait_time = between(0.2, 0.5)
     weight = enabled('steady')
+    connection_timeout = CONNECTION_TIMEOUT
+    network_timeout = NETWORK_TIMEOUT
 
     @task
     def enqueue(self):
@@ -37,12 +52,14 @@ class SteadyUser(HttpUser):
             else:
                 r.success()
 
-class BurstyUser(HttpUser):
+class BurstyUser(FastHttpUser):
     """Burst pattern: many requests in a tight loop then pause.
     Configure BURST_SIZE and BURST_PAUSE via env.
     """
     wait_time = between(1, 2)
     weight = enabled('burst')
+    connection_timeout = CONNECTION_TIMEOUT
+    network_timeout = NETWORK_TIMEOUT
     burst_size = int(os.getenv("BURST_SIZE", "50"))
     burst_pause = float(os.getenv("BURST_PAUSE", "1"))
 
@@ -52,12 +69,14 @@ class BurstyUser(HttpUser):
             self.client.post("/enqueue", json={"burst_idx": i}, name="enqueue.burst")
         gevent.sleep(self.burst_pause)
 
-class RampUser(HttpUser):
+class RampUser(FastHttpUser):
     """Ramp test: ramp up batch sizes over a few steps to find breaking point.
     Configure RAMP_STEPS, RAMP_BATCH, RAMP_PAUSE via env.
     """
     wait_time = between(0, 0)
     weight = enabled('ramp')
+    connection_timeout = CONNECTION_TIMEOUT
+    network_timeout = NETWORK_TIMEOUT
     steps = int(os.getenv("RAMP_STEPS", "5"))
     batch = int(os.getenv("RAMP_BATCH", "20"))
     pause = float(os.getenv("RAMP_PAUSE", "2"))
@@ -76,6 +95,8 @@ class RampUser(HttpUser):
 class MonitorUser(HttpUser):
     """Poll Prometheus metrics and print key values (queue_depth, worker_occupancy, rejected_requests).
     Helpful to observe backpressure/circuit-breaker behavior while tuning.
+    Stays on HttpUser: it polls every few seconds, so parsing dominates,
+    not the client stack.
     """
     wait_time = between(5, 10)
     weight = enabled('monitor')
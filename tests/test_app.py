@@ -45,6 +45,27 @@ def test_submit_and_queue_full():
         assert r2.status_code in (200, 404)
 
 
+def test_enqueue_batch_backpressure():
+    from app import pool
+
+    # a burst within capacity is accepted with one id per payload
+    r1 = client.post("/enqueue_batch", json=[{"n": i} for i in range(4)])
+    assert r1.status_code == 200
+    j1 = r1.json()
+    assert len(j1["ids"]) == 4
+    assert j1["queue_capacity"] == pool.capacity
+
+    # capacity is accounted per job, not per batch tuple: a burst that
+    # would overflow the remaining slots is rejected as a whole
+    r2 = client.post("/enqueue_batch", json=[{"n": i} for i in range(pool.capacity)])
+    assert r2.status_code == 429
+
+    # a burst that still fits is accepted after the rejection
+    r3 = client.post("/enqueue_batch", json=[{"n": i} for i in range(2)])
+    assert r3.status_code == 200
+    assert len(r3.json()["ids"]) == 2
+
+
 def test_cache_endpoint():
     r1 = client.get("/cache?key=test")
     assert r1.status_code == 200